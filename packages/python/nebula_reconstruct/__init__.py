@@ -17,11 +17,12 @@ from .manifest import (
 )
 from .reconstruct import (
     reconstruct_file,
+    reconstruct_file_to_path,
     analyze_recoverability,
     load_and_verify_shards,
     ReconstructionReport,
-    ShardInfo,
 )
+from .shards import ShardInfo
 from .erasure import (
     encode_data,
     reconstruct_data,
@@ -39,6 +40,7 @@ __all__ = [
     "ManifestError",
     # Reconstruction
     "reconstruct_file",
+    "reconstruct_file_to_path",
     "analyze_recoverability",
     "load_and_verify_shards",
     "ReconstructionReport",
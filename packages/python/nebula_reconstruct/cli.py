@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Optional
 
 from .manifest import load_manifest, verify_manifest, ManifestError
-from .reconstruct import reconstruct_file
+from .reconstruct import reconstruct_file_to_path
 
 
 def cmd_verify(args) -> int:
@@ -25,14 +25,16 @@ def cmd_verify(args) -> int:
 def cmd_rebuild(args) -> int:
     try:
         manifest = load_manifest(args.manifest)
-        verify_manifest(manifest, shard_dir=args.shard_dir)
+        # Reuse the shards verify_manifest already loaded and hashed
+        shard_infos = verify_manifest(manifest, shard_dir=args.shard_dir)
         key: Optional[bytes] = None
         if args.key_hex:
             key = bytes.fromhex(args.key_hex)
-        data = reconstruct_file(manifest, shard_dir=args.shard_dir, key=key)
         out_path = Path(args.out)
-        out_path.write_bytes(data)
-        print(f"✅ Reconstructed file written to {out_path} ({len(data)} bytes)")
+        report = reconstruct_file_to_path(
+            manifest, shard_dir=args.shard_dir, out_path=out_path, key=key, shard_infos=shard_infos
+        )
+        print(f"✅ Reconstructed file written to {out_path} ({report.reconstructed_size} bytes)")
         return 0
     except ManifestError as e:
         print(f"❌ {e}", file=sys.stderr)
@@ -6,11 +6,14 @@ Implements systematic RS encoding where:
 - Next (n-k) shards are parity shards (redundancy)
 - Any k shards can reconstruct the original data
 
-Uses reedsolo library for GF(2^8) Reed-Solomon operations.
+Uses reedsolo library for GF(2^8) Reed-Solomon operations; its codec only
+derives the parity coefficients, once per code shape, and the shard data
+itself is combined with table-driven GF(2^8) arithmetic in this module.
 """
 
-from typing import List, Tuple, Optional
+from typing import Dict, List, Sequence, Tuple, Optional, Union
 from dataclasses import dataclass
+import functools
 import math
 
 from reedsolo import RSCodec, ReedSolomonError
@@ -43,6 +46,172 @@ class ReconstructionResult:
     corrected_errors: int = 0
 
 
+def _build_gf_tables(prim: int = 0x11d) -> Tuple[List[int], List[int]]:
+    """Build exp/log tables for GF(2^8) matching reedsolo's default field."""
+    gf_exp = [0] * 512
+    gf_log = [0] * 256
+    x = 1
+    for i in range(255):
+        gf_exp[i] = x
+        gf_log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= prim
+    for i in range(255, 512):
+        gf_exp[i] = gf_exp[i - 255]
+    return gf_exp, gf_log
+
+
+_GF_EXP, _GF_LOG = _build_gf_tables()
+
+
+def _gf_mul(a: int, b: int) -> int:
+    """Multiply two GF(2^8) elements."""
+    if a == 0 or b == 0:
+        return 0
+    return _GF_EXP[_GF_LOG[a] + _GF_LOG[b]]
+
+
+@functools.lru_cache(maxsize=256)
+def _mul_table(c: int) -> bytes:
+    """256-byte translation table mapping x -> c * x in GF(2^8)."""
+    return bytes(_gf_mul(c, x) for x in range(256))
+
+
+def _compile_row(coefs: Sequence[int]) -> Tuple[Tuple[int, Optional[bytes]], ...]:
+    """
+    Specialize one GF(2^8) matrix row for _gf_combine_rows.
+
+    Zero coefficients are dropped and the rest become (source index,
+    translate table) steps, with None standing for multiplication by 1.
+    """
+    return tuple((j, None if c == 1 else _mul_table(c)) for j, c in enumerate(coefs) if c)
+
+
+def _gf_combine_rows(
+    rows: Sequence[Tuple[Tuple[int, Optional[bytes]], ...]],
+    shards: Sequence[Union[bytes, memoryview]],
+    shard_size: int
+) -> List[bytes]:
+    """
+    Compute sum(coefs[j] * shards[j]) over GF(2^8) for each compiled row.
+
+    `rows` come from _compile_row. Multiplication by a constant is a byte-wise
+    table lookup (bytes.translate) and addition is XOR, done on the shards as
+    big integers. Work runs source shard by source shard: each is turned into
+    bytes at most once and each distinct product of it is computed once, then
+    XORed into every row that uses it.
+    """
+    uses: List[List[Tuple[int, Optional[bytes]]]] = [[] for _ in shards]
+    for r, row in enumerate(rows):
+        for j, table in row:
+            uses[j].append((r, table))
+
+    accs = [0] * len(rows)
+    for shard, shard_uses in zip(shards, uses):
+        if not shard_uses:
+            continue
+        if not isinstance(shard, bytes):
+            shard = bytes(shard)  # translate is a bytes method
+        products: Dict[Optional[bytes], int] = {}
+        for r, table in shard_uses:
+            product = products.get(table)
+            if product is None:
+                product = int.from_bytes(shard if table is None else shard.translate(table), "little")
+                products[table] = product
+            accs[r] ^= product
+    return [acc.to_bytes(shard_size, "little") for acc in accs]
+
+
+@functools.lru_cache(maxsize=32)
+def _codec(parity_count: int) -> RSCodec:
+    """RSCodec for the given parity count, built once per process."""
+    return RSCodec(parity_count)
+
+
+@functools.lru_cache(maxsize=32)
+def _parity_coefficients(k: int, parity_count: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Derive the parity generator rows for a systematic RS(k + parity_count, k) code.
+
+    Encoding each unit vector with reedsolo yields the parity contribution of
+    one data shard; row i of the result holds the coefficients of parity shard i.
+    Cached per (k, parity_count), since a dataset uses one shape throughout.
+    """
+    rs = _codec(parity_count)
+    columns = []
+    for j in range(k):
+        unit = bytearray(k)
+        unit[j] = 1
+        columns.append(rs.encode(bytes(unit))[k:])
+    return tuple(tuple(columns[j][i] for j in range(k)) for i in range(parity_count))
+
+
+@functools.lru_cache(maxsize=32)
+def _encoder_plan(k: int, parity_count: int) -> Tuple[Tuple[Tuple[int, Optional[bytes]], ...], ...]:
+    """Parity rows for a (k, parity_count) code, compiled once per shape."""
+    return tuple(_compile_row(row) for row in _parity_coefficients(k, parity_count))
+
+
+def _gf_inverse(a: int) -> int:
+    """Multiplicative inverse of a non-zero GF(2^8) element."""
+    return _GF_EXP[255 - _GF_LOG[a]]
+
+
+def _invert_matrix(matrix: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Invert a square matrix over GF(2^8) by Gauss-Jordan elimination."""
+    size = len(matrix)
+    work = [list(row) + [int(i == j) for j in range(size)] for i, row in enumerate(matrix)]
+
+    for col in range(size):
+        pivot = next((r for r in range(col, size) if work[r][col]), None)
+        if pivot is None:
+            raise ReedSolomonError("Decoding matrix is singular")
+        work[col], work[pivot] = work[pivot], work[col]
+
+        inv = _gf_inverse(work[col][col])
+        work[col] = [_gf_mul(inv, v) for v in work[col]]
+
+        for r in range(size):
+            factor = work[r][col]
+            if r != col and factor:
+                work[r] = [v ^ _gf_mul(factor, p) for v, p in zip(work[r], work[col])]
+
+    return [row[size:] for row in work]
+
+
+@functools.lru_cache(maxsize=256)
+def _decode_matrix(k: int, parity_count: int, rows: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Build the matrix recovering the k data shards from the shards at `rows`.
+
+    Rows of the systematic generator are unit vectors for data shards and
+    the parity coefficients for parity shards; inverting the k x k submatrix
+    selected by the available shard indices gives the decoding matrix.
+    Cached per erasure pattern and returned as tuples so the shared entry
+    cannot be mutated.
+    """
+    coefficients = _parity_coefficients(k, parity_count)
+    generator = [
+        [int(i == j) for j in range(k)] if i < k else coefficients[i - k]
+        for i in rows
+    ]
+    return tuple(map(tuple, _invert_matrix(generator)))
+
+
+def _join_trimmed(shards: List[bytes], size: int) -> bytes:
+    """Concatenate shards up to `size` bytes, dropping padding before the copy."""
+    pieces = []
+    remaining = size
+    for shard in shards:
+        if remaining <= 0:
+            break
+        view = memoryview(shard)[:remaining]
+        pieces.append(view)
+        remaining -= len(view)
+    return b''.join(pieces)
+
+
 def encode_data(data: bytes, k: int, n: int) -> Tuple[List[bytes], RSParams]:
     """
     Encode data into n shards using Reed-Solomon erasure coding.
@@ -53,12 +222,11 @@ def encode_data(data: bytes, k: int, n: int) -> Tuple[List[bytes], RSParams]:
         n: Total number of shards (k data + n-k parity)
 
     Returns:
-        Tuple of (list of shard bytes, RSParams)
+        Tuple of (list of shards as bytes, RSParams)
 
     The encoding works as follows:
-    1. Pad data to be divisible by k
-    2. Split into k equal data shards
-    3. Generate n-k parity shards using RS coding
+    1. Split into k equal data shards, zero-padding the tail
+    2. Generate n-k parity shards using RS coding
     """
     if n <= k:
         raise ValueError(f"Total shards (n={n}) must be greater than data shards (k={k})")
@@ -67,38 +235,24 @@ def encode_data(data: bytes, k: int, n: int) -> Tuple[List[bytes], RSParams]:
 
     parity_count = n - k
 
-    # Pad data to be divisible by k
     original_size = len(data)
-    padded_size = math.ceil(original_size / k) * k
-    padded_data = data.ljust(padded_size, b'\x00')
-
-    shard_size = padded_size // k
+    shard_size = math.ceil(original_size / k)
 
-    # Split into k data shards
-    data_shards = [
-        padded_data[i * shard_size:(i + 1) * shard_size]
-        for i in range(k)
-    ]
-
-    # Generate parity shards using RS coding
-    # We encode each byte position across all shards
-    rs = RSCodec(parity_count)
-
-    parity_shards = [bytearray(shard_size) for _ in range(parity_count)]
-
-    for byte_pos in range(shard_size):
-        # Get byte at this position from each data shard
-        data_bytes = bytes([shard[byte_pos] for shard in data_shards])
+    # Split into k data shards, copying each slice out of the input exactly
+    # once (bytearray or memoryview inputs included) and zero-padding the
+    # tail. The view is released so the caller's buffer is not left pinned.
+    with memoryview(data) as view:
+        data_shards = [
+            bytes(view[i * shard_size:(i + 1) * shard_size]).ljust(shard_size, b'\x00')
+            for i in range(k)
+        ]
 
-        # RS encode to get parity bytes
-        encoded = rs.encode(data_bytes)
-        parity_bytes = encoded[k:]  # Last parity_count bytes are parity
+    # Generate parity shards using RS coding. The code is linear, so each
+    # parity shard is a GF(2^8) combination of whole data shards and can be
+    # computed shard-at-a-time instead of one byte column at a time.
+    parity_shards = _gf_combine_rows(_encoder_plan(k, parity_count), data_shards, shard_size)
 
-        # Store parity bytes in parity shards
-        for parity_idx, parity_byte in enumerate(parity_bytes):
-            parity_shards[parity_idx][byte_pos] = parity_byte
-
-    all_shards = data_shards + [bytes(ps) for ps in parity_shards]
+    all_shards = data_shards + parity_shards
 
     params = RSParams(
         data_shards=k,
@@ -119,8 +273,11 @@ def reconstruct_data(
     """
     Reconstruct original data from available shards.
 
+    Shards are treated as erasures: missing shards are recovered, but the
+    supplied shards are assumed intact, so verify their hashes first.
+
     Args:
-        shards: List of available shard data (same order as shard_indices)
+        shards: List of available shard data, bytes-like (same order as shard_indices)
         shard_indices: Index of each shard (0 to n-1)
         params: RS encoding parameters
         original_size: Original data size before padding
@@ -133,7 +290,14 @@ def reconstruct_data(
     parity_count = n - k
     shard_size = params.shard_size
 
-    available_count = len([s for s in shards if s is not None])
+    # Build shard map: index -> data. Out-of-range indices are ignored and a
+    # repeated index counts once, so only distinct usable shards are counted.
+    shard_map = {}
+    for idx, shard_data in zip(shard_indices, shards):
+        if shard_data is not None and 0 <= idx < n:
+            shard_map[idx] = shard_data
+
+    available_count = len(shard_map)
 
     if available_count < k:
         return ReconstructionResult(
@@ -146,20 +310,13 @@ def reconstruct_data(
             error=f"Need {k} shards, only {available_count} available"
         )
 
-    # Build shard map: index -> data
-    shard_map = {}
-    for idx, shard_data in zip(shard_indices, shards):
-        if shard_data is not None:
-            shard_map[idx] = shard_data
-
     # If we have all k data shards (indices 0 to k-1), just concatenate
     have_all_data_shards = all(i in shard_map for i in range(k))
 
     if have_all_data_shards:
-        reconstructed = b''.join(shard_map[i] for i in range(k))
         return ReconstructionResult(
             success=True,
-            data=reconstructed[:original_size],
+            data=_join_trimmed([shard_map[i] for i in range(k)], original_size),
             original_size=original_size,
             shards_used=k,
             shards_available=available_count,
@@ -167,58 +324,48 @@ def reconstruct_data(
             corrected_errors=0
         )
 
-    # Need to use RS decoding to recover missing data shards
-    rs = RSCodec(parity_count)
+    # Need to use RS decoding to recover missing data shards. Shards are
+    # treated as erasures only (callers verify shard hashes first), so any
+    # k available shards determine the data: solve the k x k system once and
+    # apply it to whole shards.
+    rows = tuple(sorted(shard_map)[:k])
+    erasure_count = n - available_count
 
-    # Reconstruct byte by byte across shards
-    reconstructed_data_shards = [bytearray(shard_size) for _ in range(k)]
-    corrected_count = 0
+    try:
+        decode_matrix = _decode_matrix(k, parity_count, rows)
+    except ReedSolomonError as e:
+        return ReconstructionResult(
+            success=False,
+            data=None,
+            original_size=original_size,
+            shards_used=0,
+            shards_available=available_count,
+            shards_required=k,
+            error=f"RS decode failed: {e}"
+        )
 
     try:
-        for byte_pos in range(shard_size):
-            # Build erasure-marked codeword
-            # We need k + parity_count bytes, with erasures marked
-            codeword = bytearray(n)
-            erasure_positions = []
-
-            for shard_idx in range(n):
-                if shard_idx in shard_map:
-                    codeword[shard_idx] = shard_map[shard_idx][byte_pos]
-                else:
-                    codeword[shard_idx] = 0  # Placeholder
-                    erasure_positions.append(shard_idx)
-
-            # Decode with erasure positions
-            try:
-                decoded, _, errata_pos = rs.decode(bytes(codeword), erase_pos=erasure_positions)
-                if errata_pos:
-                    corrected_count += len(errata_pos)
-            except ReedSolomonError as e:
-                return ReconstructionResult(
-                    success=False,
-                    data=None,
-                    original_size=original_size,
-                    shards_used=0,
-                    shards_available=available_count,
-                    shards_required=k,
-                    error=f"RS decode failed at byte {byte_pos}: {e}"
-                )
-
-            # Store decoded data bytes
-            for i in range(k):
-                reconstructed_data_shards[i][byte_pos] = decoded[i]
-
-        # Concatenate reconstructed data shards
-        reconstructed = b''.join(bytes(shard) for shard in reconstructed_data_shards)
+        # Only the missing data shards need decoding; the decode rows are
+        # independent, so present data shards are passed through untouched.
+        missing = [i for i in range(k) if i not in shard_map]
+        decoded = dict(zip(missing, _gf_combine_rows(
+            [_compile_row(decode_matrix[i]) for i in missing],
+            [shard_map[i] for i in rows],
+            shard_size
+        )))
+        reconstructed_data_shards = [
+            shard_map[i] if i in shard_map else decoded[i]
+            for i in range(k)
+        ]
 
         return ReconstructionResult(
             success=True,
-            data=reconstructed[:original_size],
+            data=_join_trimmed(reconstructed_data_shards, original_size),
             original_size=original_size,
-            shards_used=available_count,
+            shards_used=k,
             shards_available=available_count,
             shards_required=k,
-            corrected_errors=corrected_count
+            corrected_errors=erasure_count * shard_size
         )
 
     except Exception as e:
@@ -250,11 +397,11 @@ def analyze_reconstruction(
         Analysis dict with feasibility and details
     """
     available_count = len(available_indices)
-    missing_indices = [i for i in range(n) if i not in available_indices]
+    available = set(available_indices)
+    missing_indices = sorted(set(range(n)) - available)
 
     # Check if we have all data shards (fast path)
-    data_shard_indices = set(range(k))
-    have_all_data = data_shard_indices.issubset(set(available_indices))
+    have_all_data = available.issuperset(range(k))
 
     return {
         "feasible": available_count >= k,
@@ -3,9 +3,36 @@ Manifest loading and validation for Nebula Reconstruction Kit.
 """
 
 import json
-import hashlib
+import marshal
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .shards import (
+    ShardInfo,
+    _HASHERS,
+    _HASH_DECODERS,
+    _RACY_WINDOW_NS,
+    _expected_digest,
+    _load_shards,
+    _release_shards,
+)
+
+try:
+    import orjson
+    _HAVE_ORJSON = True
+except ImportError:
+    _HAVE_ORJSON = False
+
+# Parsed manifests, keyed by (st_dev, st_ino, st_size, st_mtime_ns,
+# st_ctime_ns) and stored as marshal snapshots so every hit hands out a
+# fresh copy (marshal.loads is cheaper than deepcopy or re-parsing).
+_MANIFEST_CACHE: "OrderedDict[Tuple[int, ...], bytes]" = OrderedDict()
+_MANIFEST_CACHE_SIZE = 64
+_MANIFEST_CACHE_LOCK = threading.Lock()
 
 
 class ManifestError(Exception):
@@ -14,24 +41,70 @@ class ManifestError(Exception):
 
 def load_manifest(path: str | Path) -> Dict[str, Any]:
     p = Path(path)
-    if not p.exists():
+    try:
+        f = p.open("rb")
+    except FileNotFoundError:
         raise ManifestError(f"Manifest not found: {path}")
+    with f:
+        st = os.fstat(f.fileno())
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        with _MANIFEST_CACHE_LOCK:
+            snapshot = _MANIFEST_CACHE.get(key)
+            if snapshot is not None:
+                _MANIFEST_CACHE.move_to_end(key)
+        if snapshot is not None:
+            return marshal.loads(snapshot)
+        raw = f.read()
+
+    manifest = _parse_manifest(raw)
+
+    # Recently modified files are not cached; see shards._RACY_WINDOW_NS
+    if time.time_ns() - max(st.st_mtime_ns, st.st_ctime_ns) > _RACY_WINDOW_NS:
+        snapshot = marshal.dumps(manifest)
+        with _MANIFEST_CACHE_LOCK:
+            _MANIFEST_CACHE[key] = snapshot
+            if len(_MANIFEST_CACHE) > _MANIFEST_CACHE_SIZE:
+                _MANIFEST_CACHE.popitem(last=False)
+    return manifest
+
+
+def _parse_manifest(raw: bytes) -> Dict[str, Any]:
+    """Parse manifest JSON from raw bytes."""
+    if _HAVE_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson only takes plain UTF-8 JSON; let json accept or reject
+            # everything else (BOMs, UTF-16/32, NaN) as it always has
+            pass
     try:
-        with p.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        # json.loads detects UTF-8/16/32 (and a UTF-8 BOM) from raw bytes
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         raise ManifestError(f"Invalid JSON: {e}") from e
 
 
-def verify_manifest(manifest: Dict[str, Any], shard_dir: Optional[str | Path] = None) -> None:
-    """Lightweight structural checks + optional shard hash verification."""
+def verify_manifest(manifest: Dict[str, Any], shard_dir: Optional[str | Path] = None) -> List[ShardInfo]:
+    """
+    Lightweight structural checks + optional shard hash verification.
+
+    When shard_dir is given, the verified shards are returned (data mapped,
+    hashes checked) so callers can pass them on to reconstruct_file instead
+    of reading and hashing every shard a second time. Without shard_dir the
+    list is empty.
+    """
     required_top = ["version", "hash_algorithm", "original_size_bytes", "rs", "shards"]
     for key in required_top:
         if key not in manifest:
             raise ManifestError(f"Missing required field: {key}")
 
-    if manifest["hash_algorithm"] != "sha256":
-        raise ManifestError(f"Unsupported hash algorithm: {manifest['hash_algorithm']}")
+    algorithm = manifest["hash_algorithm"]
+    if algorithm not in _HASHERS:
+        raise ManifestError(f"Unsupported hash algorithm: {algorithm}")
+
+    encoding = manifest.get("hash_encoding", "hex")
+    if encoding not in _HASH_DECODERS:
+        raise ManifestError(f"Unsupported hash encoding: {encoding}")
 
     rs = manifest["rs"]
     for key in ["data_shards", "parity_shards", "total_shards"]:
@@ -42,38 +115,80 @@ def verify_manifest(manifest: Dict[str, Any], shard_dir: Optional[str | Path] =
     if len(shards) < rs["data_shards"]:
         raise ManifestError("Not enough shards to reconstruct (less than data_shards)")
 
-    # Optional shard hash verification if shard_dir provided
+    # Optional shard hash verification if shard_dir provided. Entries are
+    # checked up front, then shards are hashed concurrently; errors are
+    # raised in manifest order once every mapping has been released.
+    shard_infos: List[ShardInfo] = []
     if shard_dir:
         shard_base = Path(shard_dir)
         for shard in shards:
-            if "path" not in shard or "hash" not in shard:
-                raise ManifestError("Shard missing path or hash")
-            shard_path = shard_base / shard["path"]
-            if not shard_path.exists():
-                raise ManifestError(f"Shard file missing: {shard_path}")
-            data = shard_path.read_bytes()
-            digest = hashlib.sha256(data).hexdigest()
-            if digest != shard["hash"]:
-                raise ManifestError(f"Shard hash mismatch for {shard_path}")
+            error = _check_shard_entry(shard, shard_base)
+            if error:
+                raise ManifestError(error)
+        shard_infos = _load_shards(shards, shard_base, algorithm, encoding)
+        for info in shard_infos:
+            error = _shard_error(info, shard_base)
+            if error:
+                _release_shards(shard_infos)
+                raise ManifestError(error)
 
     # Merkle check (optional)
     merkle = manifest.get("merkle")
     if merkle and merkle.get("root"):
-        computed_root = compute_merkle_root(merkle.get("leaf_hashes", []))
-        if computed_root != merkle["root"]:
+        # Hashes are decoded once here; the tree itself works on raw digests
+        leaves: List[bytes] = []
+        for leaf in merkle.get("leaf_hashes", []):
+            digest = _expected_digest(leaf, encoding)
+            if digest is None:
+                raise ManifestError("Invalid hash in merkle.leaf_hashes")
+            leaves.append(digest)
+        computed_root = _merkle_root_bytes(leaves, merkle.get("algorithm", algorithm))
+        if computed_root != _expected_digest(merkle["root"], encoding):
             raise ManifestError("Merkle root mismatch")
 
+    return shard_infos
+
+
+def _check_shard_entry(shard: Dict[str, Any], shard_base: Path) -> Optional[str]:
+    """Check one manifest shard entry before hashing; return an error message or None."""
+    if "path" not in shard or "hash" not in shard:
+        return "Shard missing path or hash"
+    index = shard.get("index")
+    if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+        return f"Shard has invalid index: {index!r}"
+    shard_path = shard_base / shard["path"]
+    if not shard_path.exists():
+        return f"Shard file missing: {shard_path}"
+    return None
+
 
-def compute_merkle_root(leaves: List[str]) -> str:
+def _shard_error(info: ShardInfo, shard_base: Path) -> Optional[str]:
+    """Error message for a loaded shard that did not verify, or None."""
+    if info.actual_digest is None:
+        # Never hashed (a directory, unreadable, or removed since the check)
+        return f"Shard unreadable: {info.error}"
+    if not info.valid:
+        return f"Shard hash mismatch for {shard_base / info.path}"
+    return None
+
+
+def compute_merkle_root(leaves: List[str], algorithm: str = "sha256") -> str:
     """Compute a simple binary Merkle root from hex leaf hashes."""
+    return _merkle_root_bytes(list(map(bytes.fromhex, leaves)), algorithm).hex()
+
+
+def _merkle_root_bytes(leaves: Sequence[bytes], algorithm: str = "sha256") -> bytes:
+    """Merkle root over raw leaf digests; nodes stay raw bytes throughout (b"" for no leaves)."""
     if not leaves:
-        return ""
-    layer = [bytes.fromhex(h) for h in leaves]
+        return b""
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
+        raise ManifestError(f"Unsupported hash algorithm: {algorithm}")
+    layer = list(leaves)
     while len(layer) > 1:
         if len(layer) % 2 == 1:
             layer.append(layer[-1])
-        next_layer = []
-        for i in range(0, len(layer), 2):
-            next_layer.append(hashlib.sha256(layer[i] + layer[i + 1]).digest())
-        layer = next_layer
-    return layer[0].hex()
+        # Pair adjacent nodes straight off one iterator; no index arithmetic
+        pairs = iter(layer)
+        layer = [hasher(left + right).digest() for left, right in zip(pairs, pairs)]
+    return layer[0]
@@ -0,0 +1,169 @@
+"""
+Shard loading and hash verification for Nebula Reconstruction Kit.
+"""
+
+import base64
+import hashlib
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Hash constructors by manifest hash_algorithm; blake3 needs the optional
+# blake3 package.
+_HASHERS: Dict[str, Callable[..., Any]] = {"sha256": hashlib.sha256}
+try:
+    import blake3
+except ImportError:
+    pass
+else:
+    _HASHERS["blake3"] = blake3.blake3
+
+# Decoders for the manifest's hash_encoding (how hash strings are written).
+_HASH_DECODERS: Dict[str, Callable[[str], bytes]] = {
+    "hex": bytes.fromhex,
+    "base64": lambda value: base64.b64decode(value, validate=True),
+}
+
+# Digests of shard files already hashed in this process, keyed by
+# (algorithm, st_dev, st_ino, st_size, st_mtime_ns, st_ctime_ns).
+_HASH_CACHE: Dict[Tuple[str, int, int, int, int, int], bytes] = {}
+_HASH_CACHE_SIZE = 4096
+_HASH_CACHE_LOCK = threading.Lock()
+# Files changed this recently are not cached: a rewrite within the same
+# timestamp tick would leave the stat key unchanged. The age is taken from
+# the later of mtime and ctime, since mtime can be set back with utime.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class ShardInfo:
+    """Information about a single shard."""
+    index: int
+    path: str
+    expected_hash: str
+    size: int
+    data: Optional[bytes] = None  # bytes or a read-only mmap of the shard file
+    actual_digest: Optional[bytes] = None
+    valid: bool = False
+    error: Optional[str] = None
+
+    @property
+    def actual_hash(self) -> Optional[str]:
+        """Hex form of actual_digest, encoded only when asked for."""
+        return self.actual_digest.hex() if self.actual_digest is not None else None
+
+
+def _expected_digest(hash_str: str, encoding: str = "hex") -> Optional[bytes]:
+    """Decode a manifest hash string to raw digest bytes (None if malformed)."""
+    try:
+        return _HASH_DECODERS[encoding](hash_str)
+    except (TypeError, ValueError):
+        return None
+
+
+def _map_shard(shard_path: Path) -> Tuple[Any, os.stat_result]:
+    """
+    Map a shard file read-only instead of copying it onto the heap.
+
+    The mapping supports the buffer protocol, so it can be hashed and handed
+    to the RS decoder directly. Empty files cannot be mapped and are returned
+    as b"". Returns (data, stat of the mapped file).
+    """
+    with shard_path.open("rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return b"", st
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm, st
+
+
+def _shard_digest(data, st: os.stat_result, algorithm: str = "sha256") -> bytes:
+    """Digest of a mapped shard, reusing it if this file was hashed before."""
+    key = (algorithm, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+    with _HASH_CACHE_LOCK:
+        digest = _HASH_CACHE.get(key)
+    if digest is not None:
+        return digest
+
+    digest = _HASHERS[algorithm](data).digest()
+    if time.time_ns() - max(st.st_mtime_ns, st.st_ctime_ns) > _RACY_WINDOW_NS:
+        with _HASH_CACHE_LOCK:
+            if len(_HASH_CACHE) >= _HASH_CACHE_SIZE:
+                del _HASH_CACHE[next(iter(_HASH_CACHE))]
+            _HASH_CACHE[key] = digest
+    return digest
+
+
+def _load_shard(
+    shard: Dict[str, Any],
+    shard_dir: Path,
+    algorithm: str = "sha256",
+    encoding: str = "hex"
+) -> ShardInfo:
+    """Load and verify a single manifest shard entry."""
+    info = ShardInfo(
+        index=shard["index"],
+        path=shard["path"],
+        expected_hash=shard["hash"],
+        size=shard.get("size_bytes", 0)
+    )
+
+    shard_path = shard_dir / shard["path"]
+
+    try:
+        data, st = _map_shard(shard_path)
+        info.data = data
+        digest = info.actual_digest = _shard_digest(data, st, algorithm)
+
+        if digest == _expected_digest(info.expected_hash, encoding):
+            info.valid = True
+        else:
+            info.error = f"Hash mismatch: expected {info.expected_hash[:16]}..., got {digest.hex()[:16]}..."
+
+    except FileNotFoundError:
+        info.error = f"File not found: {shard_path}"
+    except Exception as e:
+        info.error = str(e)
+
+    return info
+
+
+def _release_shards(shard_infos: List[ShardInfo]) -> None:
+    """
+    Unmap loaded shard data and clear ShardInfo.data.
+
+    Mappings that are still exported (a live memoryview somewhere) cannot be
+    closed yet; those are left in place for the garbage collector.
+    """
+    for info in shard_infos:
+        if isinstance(info.data, mmap.mmap):
+            try:
+                info.data.close()
+            except BufferError:
+                continue
+        info.data = None
+
+
+def _worker_count(task_count: int) -> int:
+    """Threads for hashing task_count shards: no more than shards or cores."""
+    return max(1, min(task_count, os.cpu_count() or 1))
+
+
+def _load_shards(
+    shards: List[Dict[str, Any]],
+    shard_dir: Path,
+    algorithm: str = "sha256",
+    encoding: str = "hex"
+) -> List[ShardInfo]:
+    """Load and verify manifest shard entries concurrently, keeping their order."""
+    if len(shards) <= 1:
+        return [_load_shard(shard, shard_dir, algorithm, encoding) for shard in shards]
+    with ThreadPoolExecutor(max_workers=_worker_count(len(shards))) as pool:
+        return list(pool.map(lambda shard: _load_shard(shard, shard_dir, algorithm, encoding), shards))
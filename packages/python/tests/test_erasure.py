@@ -48,6 +48,33 @@ class TestEncodeData:
         assert len(shards) == n
         assert params.shard_size == 2  # 6 / 3 = 2
 
+    def test_shards_are_bytes_independent_of_input(self):
+        """Shards should be bytes that do not pin a mutable input buffer."""
+        data = bytearray(b"0123456789ab")
+        k, n = 3, 5
+
+        shards, params = encode_data(data, k, n)
+
+        assert all(type(s) is bytes for s in shards)
+        assert b"".join(shards[:k]) == data
+        data.extend(b"more")  # Would raise BufferError if a view were still alive
+
+    def test_parity_matches_column_encoding(self):
+        """Parity shards should equal per-byte-column RS encoding."""
+        from reedsolo import RSCodec
+
+        data = bytes(range(256)) * 4 + b"tail"
+        k, n = 4, 7
+
+        shards, params = encode_data(data, k, n)
+
+        rs = RSCodec(n - k)
+        for byte_pos in range(params.shard_size):
+            column = bytes(shards[i][byte_pos] for i in range(k))
+            expected = rs.encode(column)[k:]
+            actual = bytes(shards[i][byte_pos] for i in range(k, n))
+            assert actual == expected
+
     def test_encode_invalid_params(self):
         """Should reject invalid k/n parameters."""
         data = b"test"
@@ -82,6 +109,34 @@ class TestReconstructData:
         assert result.shards_used == k
         assert result.corrected_errors == 0
 
+    def test_fast_path_skips_decoding(self, monkeypatch):
+        """Should concatenate data shards without touching the GF decoder."""
+        from nebula_reconstruct import erasure
+
+        def fail(*args, **kwargs):
+            raise AssertionError("decoder used on the fast path")
+
+        original = b"Healthy shard sets never need GF math."
+        k, n = 3, 5
+
+        shards, params = encode_data(original, k, n)
+
+        monkeypatch.setattr(erasure, "_decode_matrix", fail)
+        monkeypatch.setattr(erasure, "_gf_combine_rows", fail)
+
+        # Data shards out of order plus a parity shard still take the fast path
+        selected_indices = [2, 4, 0, 1]
+        result = reconstruct_data(
+            shards=[shards[i] for i in selected_indices],
+            shard_indices=selected_indices,
+            params=params,
+            original_size=len(original)
+        )
+
+        assert result.success
+        assert result.data == original
+        assert result.corrected_errors == 0
+
     def test_reconstruct_with_parity_shards(self):
         """Should reconstruct using mix of data and parity shards."""
         original = b"Hello, World! This is test data for RS encoding."
@@ -124,6 +179,50 @@ class TestReconstructData:
         assert result.success
         assert result.data == original
 
+    @pytest.mark.parametrize("k,n", [(2, 4), (3, 5), (4, 7)])
+    def test_reconstruct_from_any_k_shards(self, k, n):
+        """Should reconstruct from every k-sized subset of shards."""
+        from itertools import combinations
+
+        original = bytes(range(256)) * 3
+
+        shards, params = encode_data(original, k, n)
+
+        for selected_indices in combinations(range(n), k):
+            result = reconstruct_data(
+                shards=[shards[i] for i in selected_indices],
+                shard_indices=list(selected_indices),
+                params=params,
+                original_size=len(original)
+            )
+
+            assert result.success
+            assert result.data == original
+
+    def test_decode_matrix_cached_per_pattern(self):
+        """Should reuse the inverted matrix for a repeated erasure pattern."""
+        from nebula_reconstruct.erasure import _decode_matrix
+
+        original = b"Same shards missing twice in a row."
+        k, n = 3, 5
+
+        shards, params = encode_data(original, k, n)
+        selected_indices = [0, 3, 4]
+
+        _decode_matrix.cache_clear()
+        for _ in range(2):
+            result = reconstruct_data(
+                shards=[shards[i] for i in selected_indices],
+                shard_indices=selected_indices,
+                params=params,
+                original_size=len(original)
+            )
+            assert result.data == original
+
+        info = _decode_matrix.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+        assert isinstance(_decode_matrix(k, n - k, (0, 3, 4))[0], tuple)
+
     def test_reconstruct_insufficient_shards(self):
         """Should fail when fewer than k shards available."""
         original = b"Test data"
@@ -143,6 +242,25 @@ class TestReconstructData:
         assert result.data is None
         assert "Need 3 shards" in result.error
 
+    @pytest.mark.parametrize("indices", [[0, 9, 3], [3, 3, 4]])
+    def test_reconstruct_ignores_bad_and_repeated_indices(self, indices):
+        """Should count only distinct in-range indices toward k."""
+        original = b"Test data"
+        k, n = 3, 5
+
+        shards, params = encode_data(original, k, n)
+
+        result = reconstruct_data(
+            shards=[shards[i % n] for i in indices],
+            shard_indices=indices,
+            params=params,
+            original_size=len(original)
+        )
+
+        assert not result.success
+        assert result.shards_available == 2
+        assert "Need 3 shards" in result.error
+
     def test_reconstruct_preserves_original_size(self):
         """Should trim padding to original size."""
         original = b"Odd length data"  # 15 bytes, won't divide evenly by k=4
@@ -36,6 +36,59 @@ class TestLoadManifest:
         assert manifest["version"] == "nebula_reconstruct_v1"
         assert manifest["original_size_bytes"] == 100
 
+    @pytest.mark.parametrize("text", [
+        '\ufeff{"version": "v1", "shards": []}',  # UTF-8 BOM
+        '{"version": "v1", "shards": [], "extra": NaN}',
+    ])
+    def test_load_accepts_stdlib_json_inputs(self, tmp_path, text):
+        """Should accept whatever the standard json module accepts."""
+        manifest_file = tmp_path / "manifest.json"
+        manifest_file.write_bytes(text.encode("utf-8"))
+
+        manifest = load_manifest(manifest_file)
+
+        assert manifest["version"] == "v1"
+
+    def test_load_cached_manifest_is_a_copy(self, tmp_path, monkeypatch):
+        """Should hand out independent copies and notice rewrites."""
+        import os
+        import nebula_reconstruct.manifest as manifest_module
+
+        # Treat every file as settled so this one is cached
+        monkeypatch.setattr(manifest_module, "_RACY_WINDOW_NS", 0)
+        manifest_file = tmp_path / "manifest.json"
+        manifest_file.write_text(json.dumps({"version": "v1", "shards": [{"index": 0}]}))
+        old_time = manifest_file.stat().st_mtime_ns - 60 * 10**9
+        os.utime(manifest_file, ns=(old_time, old_time))
+
+        first = load_manifest(manifest_file)
+        first["shards"].append({"index": 1})
+        second = load_manifest(manifest_file)
+
+        assert second == {"version": "v1", "shards": [{"index": 0}]}
+
+        # Same size and mtime, different content
+        manifest_file.write_text(json.dumps({"version": "v2", "shards": [{"index": 0}]}))
+        os.utime(manifest_file, ns=(old_time, old_time))
+
+        assert load_manifest(manifest_file)["version"] == "v2"
+
+    def test_load_does_not_cache_backdated_manifest(self, tmp_path):
+        """Should judge a file's age by ctime too, not an mtime set with utime."""
+        import os
+        import nebula_reconstruct.manifest as manifest_module
+
+        manifest_file = tmp_path / "manifest.json"
+        manifest_file.write_text(json.dumps({"version": "v1", "shards": []}))
+        old_time = manifest_file.stat().st_mtime_ns - 60 * 10**9
+        os.utime(manifest_file, ns=(old_time, old_time))
+
+        load_manifest(manifest_file)
+
+        st = manifest_file.stat()
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        assert key not in manifest_module._MANIFEST_CACHE
+
     def test_load_missing_manifest(self, tmp_path):
         """Should raise error for missing file."""
         with pytest.raises(ManifestError, match="not found"):
@@ -49,6 +102,14 @@ class TestLoadManifest:
         with pytest.raises(ManifestError, match="Invalid JSON"):
             load_manifest(bad_file)
 
+    def test_load_invalid_encoding(self, tmp_path):
+        """Should raise ManifestError for bytes that are not valid UTF-8."""
+        bad_file = tmp_path / "bad.json"
+        bad_file.write_bytes(b'{"version": "\xff\xfe\xfd"}')
+
+        with pytest.raises(ManifestError, match="Invalid JSON"):
+            load_manifest(bad_file)
+
 
 class TestVerifyManifest:
     """Tests for manifest verification."""
@@ -93,6 +154,20 @@ class TestVerifyManifest:
         with pytest.raises(ManifestError, match="Unsupported hash"):
             verify_manifest(manifest)
 
+    def test_verify_unsupported_hash_encoding(self):
+        """Should reject an unknown hash_encoding."""
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "hash_encoding": "base32",
+            "original_size_bytes": 100,
+            "rs": {"data_shards": 3, "parity_shards": 2, "total_shards": 5},
+            "shards": [{"index": 0, "hash": "a", "path": "s.bin"}] * 3
+        }
+
+        with pytest.raises(ManifestError, match="Unsupported hash encoding"):
+            verify_manifest(manifest)
+
     def test_verify_insufficient_shards_declared(self):
         """Should reject manifest with fewer shards than k."""
         manifest = {
@@ -131,6 +206,35 @@ class TestVerifyManifest:
             ]
         }
 
+        # Should not raise, and hands back the verified shards
+        shard_infos = verify_manifest(manifest, shard_dir=tmp_path)
+
+        assert [s.index for s in shard_infos] == [0]
+        assert shard_infos[0].valid
+        assert bytes(shard_infos[0].data) == shard_data
+
+    def test_verify_shard_hash_case_insensitive(self, tmp_path):
+        """Should accept upper-case hex shard hashes."""
+        import hashlib
+
+        shard_data = b"test shard content"
+        shard_file = tmp_path / "shard-0.bin"
+        shard_file.write_bytes(shard_data)
+
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "original_size_bytes": len(shard_data),
+            "rs": {"data_shards": 1, "parity_shards": 0, "total_shards": 1},
+            "shards": [
+                {
+                    "index": 0,
+                    "hash": hashlib.sha256(shard_data).hexdigest().upper(),
+                    "path": "shard-0.bin"
+                }
+            ]
+        }
+
         # Should not raise
         verify_manifest(manifest, shard_dir=tmp_path)
 
@@ -167,6 +271,111 @@ class TestVerifyManifest:
         with pytest.raises(ManifestError, match="missing"):
             verify_manifest(manifest, shard_dir=tmp_path)
 
+    def test_verify_unreadable_shard_reports_error(self, tmp_path):
+        """Should report why a shard could not be read, not a hash mismatch."""
+        (tmp_path / "shard-0.bin").mkdir()
+
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "original_size_bytes": 100,
+            "rs": {"data_shards": 1, "parity_shards": 0, "total_shards": 1},
+            "shards": [
+                {"index": 0, "hash": "abc", "path": "shard-0.bin"}
+            ]
+        }
+
+        with pytest.raises(ManifestError, match="Shard unreadable: .*directory"):
+            verify_manifest(manifest, shard_dir=tmp_path)
+
+    def test_verify_releases_shards_on_mismatch(self, tmp_path, monkeypatch):
+        """Should unmap every loaded shard before raising on a bad one."""
+        import hashlib
+        import nebula_reconstruct.manifest as manifest_module
+
+        released = []
+        real_release = manifest_module._release_shards
+
+        def release(infos):
+            released.extend(infos)
+            real_release(infos)
+
+        monkeypatch.setattr(manifest_module, "_release_shards", release)
+
+        shards = []
+        for i in range(3):
+            content = f"shard {i}".encode() * 100
+            (tmp_path / f"shard-{i}.bin").write_bytes(content)
+            shards.append({"index": i, "hash": hashlib.sha256(content).hexdigest(), "path": f"shard-{i}.bin"})
+        shards[1]["hash"] = "00" * 32
+
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "original_size_bytes": 100,
+            "rs": {"data_shards": 3, "parity_shards": 0, "total_shards": 3},
+            "shards": shards
+        }
+
+        with pytest.raises(ManifestError, match="hash mismatch.*shard-1"):
+            verify_manifest(manifest, shard_dir=tmp_path)
+
+        assert [info.index for info in released] == [0, 1, 2]
+        assert all(info.data is None for info in released)
+
+    @pytest.mark.parametrize("index", [None, "0", 1.0, True, -1])
+    def test_verify_rejects_invalid_shard_index(self, tmp_path, index):
+        """Should reject shard entries without a non-negative integer index."""
+        import hashlib
+
+        (tmp_path / "shard-0.bin").write_bytes(b"content")
+        shard = {"hash": hashlib.sha256(b"content").hexdigest(), "path": "shard-0.bin"}
+        if index is not None:
+            shard["index"] = index
+
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "original_size_bytes": 7,
+            "rs": {"data_shards": 1, "parity_shards": 0, "total_shards": 1},
+            "shards": [shard]
+        }
+
+        with pytest.raises(ManifestError, match="invalid index"):
+            verify_manifest(manifest, shard_dir=tmp_path)
+
+    def test_verify_rehashes_rewritten_shard(self, tmp_path, monkeypatch):
+        """Should not trust a cached digest once the shard file is rewritten."""
+        import hashlib
+        import os
+        import nebula_reconstruct.shards as shards_module
+
+        # Treat every file as settled so its digest is cached
+        monkeypatch.setattr(shards_module, "_RACY_WINDOW_NS", 0)
+        shard_file = tmp_path / "shard-0.bin"
+        shard_file.write_bytes(b"original content")
+        old_time = shard_file.stat().st_mtime_ns - 60 * 10**9
+        os.utime(shard_file, ns=(old_time, old_time))
+
+        manifest = {
+            "version": "nebula_reconstruct_v1",
+            "hash_algorithm": "sha256",
+            "original_size_bytes": 16,
+            "rs": {"data_shards": 1, "parity_shards": 0, "total_shards": 1},
+            "shards": [
+                {"index": 0, "hash": hashlib.sha256(b"original content").hexdigest(), "path": "shard-0.bin"}
+            ]
+        }
+        verify_manifest(manifest, shard_dir=tmp_path)
+        verify_manifest(manifest, shard_dir=tmp_path)
+
+        # Same size and mtime, different bytes
+        shard_file.write_bytes(b"tampered content")
+        os.utime(shard_file, ns=(old_time, old_time))
+
+        with pytest.raises(ManifestError, match="hash mismatch"):
+            verify_manifest(manifest, shard_dir=tmp_path)
+
 
 class TestComputeMerkleRoot:
     """Tests for Merkle root computation."""
@@ -206,6 +415,43 @@ class TestComputeMerkleRoot:
 
         assert len(root) == 64  # SHA256 hex
 
+    def test_odd_levels_duplicate_last_node(self):
+        """Should duplicate the last raw digest on every odd level."""
+        import hashlib
+
+        def h(a, b):
+            return hashlib.sha256(a + b).digest()
+
+        digests = [hashlib.sha256(str(i).encode()).digest() for i in range(5)]
+        # 5 -> 3 -> 2 -> 1, padding the odd levels
+        level1 = [h(digests[0], digests[1]), h(digests[2], digests[3]), h(digests[4], digests[4])]
+        level2 = [h(level1[0], level1[1]), h(level1[2], level1[2])]
+        expected_root = h(level2[0], level2[1]).hex()
+
+        root = compute_merkle_root([d.hex() for d in digests])
+
+        assert root == expected_root
+
+    def test_unsupported_algorithm(self):
+        """Should reject a Merkle algorithm with no hasher."""
+        import hashlib
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(2)]
+
+        with pytest.raises(ManifestError, match="Unsupported hash"):
+            compute_merkle_root(leaves, algorithm="md5")
+
+    def test_bytes_helper_matches_hex_api(self):
+        """Should give the same root from raw digests as from hex leaves."""
+        import hashlib
+        from nebula_reconstruct.manifest import _merkle_root_bytes
+
+        digests = [hashlib.sha256(str(i).encode()).digest() for i in range(7)]
+
+        root = _merkle_root_bytes(digests)
+
+        assert root.hex() == compute_merkle_root([d.hex() for d in digests])
+        assert len(digests) == 7  # caller's list is not padded in place
+
     def test_empty_leaves(self):
         """Should return empty string for no leaves."""
         root = compute_merkle_root([])
@@ -3,58 +3,66 @@ Tests for file reconstruction.
 """
 
 import json
+import os
 import hashlib
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from nebula_reconstruct import (
     encode_data,
     reconstruct_file,
+    reconstruct_file_to_path,
     analyze_recoverability,
     load_and_verify_shards,
+    verify_manifest,
     ManifestError,
 )
 
 
-def create_test_shards(tmp_path, original_data, k=3, n=5):
+def create_test_shards(tmp_path, original_data, k=3, n=5, hash_algorithm="sha256"):
     """
     Helper to create RS-encoded shards and manifest.
 
     Returns:
         Tuple of (manifest_dict, shards_dir)
     """
+    if hash_algorithm == "blake3":
+        from blake3 import blake3 as hash_fn
+    else:
+        hash_fn = hashlib.sha256
+
     shards, params = encode_data(original_data, k, n)
 
     # Create shards directory
     shards_dir = tmp_path / "shards"
     shards_dir.mkdir()
 
-    shard_metadata = []
-    leaf_hashes = []
-
-    for i, shard_data in enumerate(shards):
+    def write_shard(i):
+        # Write and hash in one worker while the shard is still hot in cache
+        shard_data = shards[i]
         shard_path = f"shard-{i}.bin"
         (shards_dir / shard_path).write_bytes(shard_data)
-
-        shard_hash = hashlib.sha256(shard_data).hexdigest()
-        leaf_hashes.append(shard_hash)
-
-        shard_metadata.append({
+        return {
             "index": i,
-            "hash": shard_hash,
+            "hash": hash_fn(shard_data).hexdigest(),
             "size_bytes": len(shard_data),
             "path": shard_path
-        })
+        }
+
+    with ThreadPoolExecutor() as pool:
+        shard_metadata = list(pool.map(write_shard, range(n)))
+    leaf_hashes = [s["hash"] for s in shard_metadata]
 
     # Compute Merkle root
     from nebula_reconstruct import compute_merkle_root
-    merkle_root = compute_merkle_root(leaf_hashes)
+    merkle_root = compute_merkle_root(leaf_hashes, hash_algorithm)
 
     manifest = {
         "version": "nebula_reconstruct_v1",
-        "hash_algorithm": "sha256",
+        "hash_algorithm": hash_algorithm,
         "original_size_bytes": len(original_data),
-        "original_hash": hashlib.sha256(original_data).hexdigest(),
+        "original_hash": hash_fn(original_data).hexdigest(),
         "rs": {
             "data_shards": k,
             "parity_shards": n - k,
@@ -62,7 +70,7 @@ def create_test_shards(tmp_path, original_data, k=3, n=5):
         },
         "shards": shard_metadata,
         "merkle": {
-            "algorithm": "sha256",
+            "algorithm": hash_algorithm,
             "root": merkle_root,
             "leaf_hashes": leaf_hashes
         }
@@ -84,9 +92,55 @@ class TestReconstructFile:
         assert data == original
         assert report.success
         assert report.hash_verified
-        assert report.shards_valid == 5
+        # All data shards verify, so parity shards are never read
+        assert report.shards_valid == 3
         assert report.shards_required == 3
 
+    def test_reconstruct_skips_parity_when_data_intact(self, tmp_path):
+        """Should not read parity shards when all data shards verify."""
+        original = b"Healthy shard set, parity not needed."
+        manifest, shards_dir = create_test_shards(tmp_path, original, k=3, n=5)
+
+        # Parity shards would fail verification if they were read
+        (shards_dir / "shard-3.bin").write_bytes(b"garbage")
+        (shards_dir / "shard-4.bin").write_bytes(b"garbage")
+
+        data, report = reconstruct_file(manifest, shards_dir)
+
+        assert data == original
+        parity = [s for s in report.shard_details if s.index >= 3]
+        assert all(s.data is None and s.error.startswith("Not read") for s in parity)
+
+    def test_reconstruct_reuses_verified_shards(self, tmp_path):
+        """Should use shards from verify_manifest without re-reading them."""
+        original = b"Verified once, reconstructed without a second pass."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+
+        shard_infos = verify_manifest(manifest, shard_dir=shards_dir)
+        # Shards are already loaded; the directory is no longer consulted
+        for shard_file in shards_dir.iterdir():
+            shard_file.unlink()
+
+        data, report = reconstruct_file(manifest, shards_dir, shard_infos=shard_infos)
+
+        assert data == original
+        assert report.shards_valid == 5
+
+    @pytest.mark.parametrize("missing", [None, "shard-0.bin"])
+    def test_reconstruct_releases_loaded_shards(self, tmp_path, missing):
+        """Should unmap the shards it loaded once reconstruction is done."""
+        original = b"Shard mappings are closed after the rebuild." * 100
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        if missing:
+            (shards_dir / missing).unlink()
+
+        data, report = reconstruct_file(manifest, shards_dir)
+        to_path_report = reconstruct_file_to_path(manifest, shards_dir, tmp_path / "out.bin")
+
+        assert data == original
+        assert all(s.data is None for s in report.shard_details)
+        assert all(s.data is None for s in to_path_report.shard_details)
+
     def test_reconstruct_with_missing_shards(self, tmp_path):
         """Should reconstruct with some shards missing."""
         original = b"Data for partial reconstruction test."
@@ -152,6 +206,247 @@ class TestReconstructFile:
         assert report.success
 
 
+class TestReconstructBlake3:
+    """Tests for manifests hashed with BLAKE3."""
+
+    def test_verify_and_reconstruct(self, tmp_path):
+        """Should verify and rebuild a blake3 manifest end to end."""
+        pytest.importorskip("blake3")
+        original = b"Hashed with BLAKE3 instead of SHA-256."
+        manifest, shards_dir = create_test_shards(tmp_path, original, hash_algorithm="blake3")
+        (shards_dir / "shard-0.bin").unlink()
+        out_path = tmp_path / "out.bin"
+
+        shard_infos = verify_manifest(manifest)
+        data, report = reconstruct_file(manifest, shards_dir)
+        to_path_report = reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert shard_infos == []
+        assert data == original
+        assert report.hash_verified
+        assert out_path.read_bytes() == original
+        assert to_path_report.hash_verified
+
+    def test_blake3_hash_mismatch(self, tmp_path):
+        """Should reject a shard whose blake3 hash does not match."""
+        pytest.importorskip("blake3")
+        manifest, shards_dir = create_test_shards(tmp_path, b"Some data", hash_algorithm="blake3")
+        (shards_dir / "shard-1.bin").write_bytes(b"corrupted")
+
+        shard_infos = load_and_verify_shards(manifest, shards_dir)
+
+        assert "mismatch" in shard_infos[1].error.lower()
+
+
+class TestReconstructBase64Hashes:
+    """Tests for manifests with hash_encoding set to base64."""
+
+    @staticmethod
+    def _to_base64(manifest):
+        import base64
+
+        def b64(hex_hash):
+            return base64.b64encode(bytes.fromhex(hex_hash)).decode()
+
+        manifest["hash_encoding"] = "base64"
+        manifest["original_hash"] = b64(manifest["original_hash"])
+        for shard in manifest["shards"]:
+            shard["hash"] = b64(shard["hash"])
+        merkle = manifest["merkle"]
+        merkle["leaf_hashes"] = [b64(h) for h in merkle["leaf_hashes"]]
+        merkle["root"] = b64(merkle["root"])
+        return manifest
+
+    def test_verify_and_reconstruct(self, tmp_path):
+        """Should verify and rebuild with base64-encoded hashes."""
+        original = b"Hashes stored as base64 instead of hex."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        self._to_base64(manifest)
+        out_path = tmp_path / "out.bin"
+
+        shard_infos = verify_manifest(manifest, shard_dir=shards_dir)
+        (shards_dir / "shard-1.bin").unlink()
+        data, report = reconstruct_file(manifest, shards_dir)
+        to_path_report = reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert all(s.valid for s in shard_infos)
+        assert data == original
+        assert report.hash_verified
+        assert out_path.read_bytes() == original
+        assert to_path_report.hash_verified
+
+    def test_base64_hash_mismatch(self, tmp_path):
+        """Should still detect corrupted shards with base64 hashes."""
+        manifest, shards_dir = create_test_shards(tmp_path, b"Some data")
+        self._to_base64(manifest)
+        (shards_dir / "shard-0.bin").write_bytes(b"corrupted")
+
+        with pytest.raises(ManifestError, match="hash mismatch"):
+            verify_manifest(manifest, shard_dir=shards_dir)
+
+
+class TestReconstructFileToPath:
+    """Tests for reconstruct_file_to_path function."""
+
+    def test_fast_path_writes_original(self, tmp_path):
+        """Should concatenate data shards into the output file."""
+        original = bytes(range(256)) * 10 + b"odd tail"
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        out_path = tmp_path / "out.bin"
+
+        report = reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert out_path.read_bytes() == original
+        assert report.success
+        assert report.hash_verified
+        assert report.reconstructed_size == len(original)
+
+    def test_fallback_with_missing_data_shard(self, tmp_path):
+        """Should RS-decode when a data shard is missing."""
+        original = b"Data that needs parity to come back."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        (shards_dir / "shard-1.bin").unlink()
+        out_path = tmp_path / "out.bin"
+
+        report = reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert out_path.read_bytes() == original
+        assert report.success
+
+    def test_hash_mismatch_writes_nothing(self, tmp_path):
+        """Should not create the output when the data hash is wrong."""
+        manifest, shards_dir = create_test_shards(tmp_path, b"Some data")
+        manifest["original_hash"] = "00" * 32
+        out_path = tmp_path / "out.bin"
+
+        with pytest.raises(ManifestError, match="Hash mismatch"):
+            reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert not out_path.exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["shards"]
+
+    def test_leaves_existing_partial_file_alone(self, tmp_path):
+        """Should not overwrite or delete an unrelated <out>.partial file."""
+        original = b"Data written next to a user's own .partial file."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        out_path = tmp_path / "out.bin"
+        user_file = tmp_path / "out.bin.partial"
+        user_file.write_bytes(b"keep me")
+
+        reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert out_path.read_bytes() == original
+        assert user_file.read_bytes() == b"keep me"
+
+    def test_writes_verified_bytes_after_shard_swap(self, tmp_path):
+        """Should write the bytes that were verified, not a file swapped in later."""
+        original = b"Verified content that must survive a shard swap."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        infos = verify_manifest(manifest, shards_dir)
+
+        shard_path = shards_dir / "shard-0.bin"
+        evil_path = shards_dir / "evil.bin"
+        evil_path.write_bytes(b"EVIL" * (shard_path.stat().st_size // 4 + 1))
+        os.replace(evil_path, shard_path)
+
+        out_path = tmp_path / "out.bin"
+        report = reconstruct_file_to_path(manifest, shards_dir, out_path, shard_infos=infos)
+
+        assert out_path.read_bytes() == original
+        assert report.hash_verified
+
+    def test_output_may_replace_a_shard(self, tmp_path):
+        """Should not truncate a shard that is also the output path."""
+        original = bytes(range(256)) * 4
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+        out_path = shards_dir / "shard-0.bin"
+
+        report = reconstruct_file_to_path(manifest, shards_dir, out_path)
+
+        assert out_path.read_bytes() == original
+        assert report.success
+
+
+class TestReconstructEncrypted:
+    """Tests for reconstruction of AES-256-GCM encrypted data."""
+
+    @staticmethod
+    def _encrypted_shards(tmp_path, plaintext, key, separate_tag=True):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        iv = bytes(range(12))
+        sealed = AESGCM(key).encrypt(iv, plaintext, None)
+        ciphertext, tag = sealed[:-16], sealed[-16:]
+
+        manifest, shards_dir = create_test_shards(
+            tmp_path, ciphertext if separate_tag else sealed
+        )
+        manifest["original_hash"] = hashlib.sha256(plaintext).hexdigest()
+        manifest["encryption"] = {"algorithm": "aes-256-gcm", "iv": iv.hex()}
+        if separate_tag:
+            manifest["encryption"]["tag"] = tag.hex()
+        return manifest, shards_dir
+
+    @pytest.mark.parametrize("separate_tag", [True, False])
+    def test_reconstruct_encrypted(self, tmp_path, separate_tag):
+        """Should decrypt with the tag stored separately or appended."""
+        plaintext = b"Secret data that was encrypted before sharding."
+        key = bytes(32)
+        manifest, shards_dir = self._encrypted_shards(
+            tmp_path, plaintext, key, separate_tag
+        )
+
+        data, report = reconstruct_file(manifest, shards_dir, key=key)
+
+        assert data == plaintext
+        assert report.decrypted
+        assert report.hash_verified
+
+    @pytest.mark.parametrize("separate_tag", [True, False])
+    def test_reconstruct_encrypted_to_path(self, tmp_path, monkeypatch, separate_tag):
+        """Should stream-decrypt to the output file in chunks."""
+        import nebula_reconstruct.reconstruct as reconstruct_module
+
+        monkeypatch.setattr(reconstruct_module, "_STREAM_CHUNK_SIZE", 7)
+        plaintext = bytes(range(256)) * 3
+        key = bytes(32)
+        manifest, shards_dir = self._encrypted_shards(
+            tmp_path, plaintext, key, separate_tag
+        )
+        (shards_dir / "shard-0.bin").unlink()  # Force the RS decode path
+        out_path = tmp_path / "out.bin"
+
+        report = reconstruct_file_to_path(manifest, shards_dir, out_path, key=key)
+
+        assert out_path.read_bytes() == plaintext
+        assert report.decrypted
+        assert report.hash_verified
+        assert report.reconstructed_size == len(plaintext)
+
+    def test_reconstruct_encrypted_to_path_wrong_key(self, tmp_path):
+        """Should leave no output file when authentication fails."""
+        manifest, shards_dir = self._encrypted_shards(
+            tmp_path, b"Secret data", bytes(32)
+        )
+        out_path = tmp_path / "out.bin"
+
+        with pytest.raises(ManifestError, match="Decryption failed"):
+            reconstruct_file_to_path(
+                manifest, shards_dir, out_path, key=b"\x01" * 32
+            )
+
+        assert list(tmp_path.glob("out.bin*")) == []
+
+    def test_reconstruct_encrypted_wrong_key(self, tmp_path):
+        """Should fail authentication with the wrong key."""
+        manifest, shards_dir = self._encrypted_shards(
+            tmp_path, b"Secret data", bytes(32)
+        )
+
+        with pytest.raises(ManifestError, match="Decryption failed"):
+            reconstruct_file(manifest, shards_dir, key=b"\x01" * 32)
+
+
 class TestAnalyzeRecoverability:
     """Tests for analyze_recoverability function."""
 
@@ -228,6 +523,16 @@ class TestLoadAndVerifyShards:
         assert all(s.valid for s in shard_infos)
         assert all(s.data is not None for s in shard_infos)
 
+    def test_loaded_data_matches_files(self, tmp_path):
+        """Loaded shard data should match the shard files byte for byte."""
+        original = b"Test data for shard loading."
+        manifest, shards_dir = create_test_shards(tmp_path, original)
+
+        shard_infos = load_and_verify_shards(manifest, shards_dir)
+
+        for info in shard_infos:
+            assert bytes(info.data) == (shards_dir / info.path).read_bytes()
+
     def test_load_missing_shard(self, tmp_path):
         """Should mark missing shards as invalid."""
         original = b"Test data"
@@ -257,6 +562,8 @@ class TestLoadAndVerifyShards:
         assert not shard_1.valid
         assert shard_1.data is not None  # File exists but hash wrong
         assert "mismatch" in shard_1.error.lower()
+        assert shard_1.actual_digest == hashlib.sha256(b"wrong content").digest()
+        assert shard_1.actual_hash == hashlib.sha256(b"wrong content").hexdigest()
 
 
 class TestEndToEnd: